@@ -0,0 +1,734 @@
+"""HTTP/WebSocket gateway that serves SaraBot to many guests from one process.
+
+Each WebSocket connection gets its own BookingSession. Every text message is
+one turn of the dialogue and gets exactly one text message back. Turns run on a
+bounded thread pool, because date parsing and bookings.csv access block.
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import main as sarabot
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+CANCEL_WORDS = ['cancel', 'exit']
+CANCEL_MESSAGE = "Booking canceled. Let me know how I can assist you further!"
+MAX_NIGHTS = 365
+
+# Availability check and CSV append must not interleave between workers,
+# otherwise two guests can both get the last room.
+_storage_lock = threading.Lock()
+
+
+class ProtocolError(Exception):
+    """Raised when a peer breaks the WebSocket protocol."""
+
+    def __init__(self, code, reason):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+def _apply_mask(payload, key):
+    """XOR a payload with a 4-byte WebSocket masking key."""
+    if not payload:
+        return payload
+    repeated = (key * (len(payload) // 4 + 1))[:len(payload)]
+    masked = int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")
+    return masked.to_bytes(len(payload), "big")
+
+
+def encode_frame(opcode, payload=b"", mask=False):
+    """Encode a single final WebSocket frame. Clients must mask, servers must not."""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < (1 << 16):
+        header.append(mask_bit | 126)
+        header += struct.pack("!H", length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack("!Q", length)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _apply_mask(payload, key)
+    return bytes(header) + payload
+
+
+def close_payload(code, reason=""):
+    """Build the body of a close frame."""
+    return struct.pack("!H", code) + reason.encode("utf-8")[:123]
+
+
+async def read_frame(reader, max_size, expect_mask=True):
+    """Read one WebSocket frame and return (fin, opcode, payload).
+
+    Frames from clients must be masked and frames from servers must not be;
+    expect_mask says which side the frame comes from.
+    """
+    head = await reader.readexactly(2)
+    fin = bool(head[0] & 0x80)
+    opcode = head[0] & 0x0F
+    masked = bool(head[1] & 0x80)
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if masked != expect_mask:
+        raise ProtocolError(1002, "Client frames must be masked." if expect_mask else "Server frames must not be masked.")
+    if opcode >= OP_CLOSE and (length > 125 or not fin):
+        raise ProtocolError(1002, "Invalid control frame.")
+    if length > max_size:
+        raise ProtocolError(1009, "Message too big.")
+    key = await reader.readexactly(4) if masked else None
+    payload = await reader.readexactly(length)
+    if key:
+        payload = _apply_mask(payload, key)
+    return fin, opcode, payload
+
+
+async def read_message(reader, writer, max_size, client=False):
+    """Read one complete data message, answering pings along the way.
+
+    Pass client=True when reading as the client side of the connection.
+    Returns (opcode, payload) where opcode is OP_TEXT, OP_BINARY or OP_CLOSE.
+    """
+    message = None
+    message_opcode = None
+    while True:
+        limit = max_size - len(message) if message else max_size
+        fin, opcode, payload = await read_frame(reader, max(limit, 125), expect_mask=not client)
+        if opcode == OP_PING:
+            writer.write(encode_frame(OP_PONG, payload, mask=client))
+            continue
+        if opcode == OP_PONG:
+            continue
+        if opcode == OP_CLOSE:
+            return OP_CLOSE, payload
+        if opcode == OP_CONTINUATION:
+            if message is None:
+                raise ProtocolError(1002, "Unexpected continuation frame.")
+            if len(payload) > limit:
+                raise ProtocolError(1009, "Message too big.")
+            message += payload
+        elif opcode in (OP_TEXT, OP_BINARY):
+            if message is not None:
+                raise ProtocolError(1002, "Expected continuation frame.")
+            if len(payload) > max_size:
+                raise ProtocolError(1009, "Message too big.")
+            message = bytearray(payload)
+            message_opcode = opcode
+        else:
+            raise ProtocolError(1002, "Unknown opcode.")
+        if fin:
+            return message_opcode, bytes(message)
+
+
+def valid_key(client_key):
+    """Check that a Sec-WebSocket-Key is base64 for 16 bytes, as RFC 6455 requires."""
+    try:
+        return len(base64.b64decode(client_key, validate=True)) == 16
+    except (binascii.Error, ValueError):
+        return False
+
+
+def accept_key(client_key):
+    """Compute the Sec-WebSocket-Accept value for a handshake key."""
+    digest = hashlib.sha1((client_key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+class BookingSession:
+    """Message-driven version of the terminal dialogue in main().
+
+    respond() takes one guest message and returns the bot's reply. The prompts,
+    validation and cancel words match handle_booking() so both front ends behave
+    the same way.
+    """
+
+    def __init__(self):
+        self.state = "idle"
+        self.data = {}
+        self.last_booking = None
+        self.closed = False
+
+    def respond(self, user_input):
+        """Advance the dialogue by one guest message and return the reply text."""
+        user_input = user_input.strip()
+        if self.state != "idle" and self.state != "menu" and user_input.lower() in CANCEL_WORDS:
+            return self._cancel()
+        handler = getattr(self, "_on_" + self.state)
+        return "\n".join(handler(user_input))
+
+    def _cancel(self, message=CANCEL_MESSAGE):
+        self.state = "idle"
+        self.data = {}
+        return message
+
+    def _start_booking(self):
+        # Like main(), a new booking replaces the last one even if it is canceled.
+        self.last_booking = None
+        self.state = "name"
+        self.data = {}
+        return [sarabot.RESPONSES["booking"], "Your full name?"]
+
+    def _on_idle(self, user_input):
+        if not user_input and self.last_booking:
+            self.state = "menu"
+            return ["Would you like to view your last booking summary, make another booking, or exit? (view/book/exit)"]
+        if not user_input:
+            return ["Please type something to continue."]
+
+        intent = sarabot.get_purpose(user_input)
+        if intent == "goodbye":
+            self.closed = True
+            return [sarabot.RESPONSES["goodbye"]]
+        if intent == "booking":
+            return self._start_booking()
+        return [sarabot.RESPONSES[intent]]
+
+    def _on_menu(self, user_input):
+        choice = user_input.lower()
+        self.state = "idle"
+        if choice == "view":
+            lines = sarabot.format_booking_summary(self.last_booking, is_final=True)
+            return lines + ["What would you like to do next? (e.g., 'book', 'exit')"]
+        if choice == "book":
+            return self._start_booking()
+        if choice == "exit":
+            self.closed = True
+            return [sarabot.RESPONSES["goodbye"]]
+        return ["Please choose 'view', 'book', or 'exit'."]
+
+    def _on_name(self, user_input):
+        self.data['name'] = user_input
+        self.state = "phone"
+        return ["Your phone number?"]
+
+    def _on_phone(self, user_input):
+        error = sarabot.validate_phone(user_input)
+        if error:
+            return [error]
+        self.data['phone'] = user_input
+        self.state = "dates"
+        return ["What dates would you like to book? (e.g., 'tomorrow' or '2025-07-16')"]
+
+    def _on_dates(self, user_input):
+        try:
+            start, end, nights, error = sarabot.parser_date(user_input)
+        except (OverflowError, ValueError):
+            start, error = None, None
+        if error:
+            return [error]
+        if not start:
+            return ["I couldn't understand that date. Please try again (e.g., '2025-07-16' or 'tomorrow')."]
+        if nights and nights > MAX_NIGHTS:
+            return [f"Stays can be booked for up to {MAX_NIGHTS} nights. Please enter your dates again."]
+        self.data['start'] = start
+        if not nights:
+            self.state = "nights"
+            return ["How many nights would you like to stay?"]
+        self.data['end'] = end
+        self.data['nights'] = nights
+        return self._ask_guests()
+
+    def _on_nights(self, user_input):
+        lines = []
+        try:
+            nights = int(user_input)
+        except ValueError:
+            nights = 1
+            lines.append("Invalid input. Assuming 1 night.")
+        if not 1 <= nights <= MAX_NIGHTS:
+            return [f"Please enter a number of nights between 1 and {MAX_NIGHTS}."]
+        start = datetime.strptime(self.data['start'], "%Y-%m-%d")
+        self.data['end'] = (start + timedelta(days=nights)).strftime("%Y-%m-%d")
+        self.data['nights'] = nights
+        return lines + self._ask_guests()
+
+    def _ask_guests(self):
+        self.state = "guests"
+        return [
+            f"Booking from {self.data['start']} to {self.data['end']} for {self.data['nights']} nights.",
+            "Please enter number of adults, children, and their ages (e.g., '2 adults, 1 child, ages 5' or '2,1,5'):",
+        ]
+
+    def _on_guests(self, user_input):
+        adults, children, children_ages, error = sarabot.parser_guests(user_input)
+        if error:
+            return [error]
+        if adults < 1:
+            return ["At least one adult is required."]
+        self.data['adults'] = adults
+        self.data['children'] = children
+        self.data['children_ages'] = children_ages
+        self.data['total_guests'] = adults + children
+        self.state = "rooms"
+
+        lines = [
+            f"Got it — Adults: {adults}, Children: {children}, Ages: {', '.join(map(str, children_ages)) if children_ages else 'N/A'}",
+            f"Based on {adults + children} guests, available room options:",
+        ]
+        for room, details in sarabot.ROOM_OPTIONS.items():
+            lines.append(f"- {room}: {details['price']}€/night — {details['description']}, ensuite bathroom, TV, Wi-Fi (up to {details['max_guests']} guests)")
+        lines.append("Please select one or more room types and quantities (e.g., '1 Family Suite' or '1 King Room, 1 Two Bed Room') or type 'cancel' to exit:")
+        return lines
+
+    def _on_rooms(self, user_input):
+        selected_rooms, total_capacity, error = sarabot.parser_rooms(
+            user_input, self.data['total_guests'], self.data['start'], self.data['end'])
+        if error == "cancel":
+            return [self._cancel()]
+        if error:
+            return [error]
+        self.data['rooms'] = selected_rooms
+        self.state = "breakfast"
+        return ["Include breakfast for 15€ per person per night? (yes/no)"]
+
+    def _on_breakfast(self, user_input):
+        include_breakfast = user_input.lower() in ['yes', 'y']
+        self.data['include_breakfast'] = include_breakfast
+        self.data['breakfast_cost'] = 15 * self.data['total_guests'] * self.data['nights'] if include_breakfast else 0
+        self.data['special_requirements'] = {}
+        self.state = "shuttle"
+        return ["Do you need an airport shuttle for 60€ (up to 4 guests)? (yes/no):"]
+
+    def _on_shuttle(self, user_input):
+        answer = user_input.lower()
+        if answer not in ['yes', 'y', 'no', 'n']:
+            return ["Please answer 'yes' or 'no'."]
+        self.data['special_requirements']["shuttle"] = "Yes" if answer in ['yes', 'y'] else "No"
+        self.data['shuttle_cost'] = 60 if answer in ['yes', 'y'] else 0
+        self.state = "disability"
+        return ["Do you require disability accommodations? (yes/no):"]
+
+    def _on_disability(self, user_input):
+        answer = user_input.lower()
+        lines = []
+        if answer in ['yes', 'y']:
+            self.data['special_requirements']["disability"] = "Yes"
+            lines.append("We will provide a disability-friendly room with accessible features.")
+        elif answer in ['no', 'n']:
+            self.data['special_requirements']["disability"] = "No"
+        else:
+            return ["Please answer 'yes' or 'no'."]
+        self.state = "other"
+        return lines + ["Any other special requests? (yes/no):"]
+
+    def _on_other(self, user_input):
+        answer = user_input.lower()
+        if answer in ['no', 'n', 'none']:
+            self.data['special_requirements']["other"] = "None"
+            return self._ask_payment_method()
+        if answer in ['yes', 'y']:
+            self.state = "other_details"
+            return ["Please enter what special requests you have (e.g., extra pillows, late checkout):"]
+        return ["Please answer 'yes' or 'no'."]
+
+    def _on_other_details(self, user_input):
+        if user_input.lower() == 'none':
+            self.data['special_requirements']["other"] = "None"
+            return self._ask_payment_method()
+        if not user_input:
+            return ["Please specify your requests or type 'none'."]
+        requests = user_input.replace(",", "").replace(";", "")
+        self.data['special_requirements']["other"] = requests
+        return [f"Thank you, we have noted your special requests: {requests}."] + self._ask_payment_method()
+
+    def _ask_payment_method(self):
+        self.state = "payment_method"
+        return ["Payment method? (credit card, PayPal, cash)"]
+
+    def _on_payment_method(self, user_input):
+        payment_method = user_input.lower()
+        if payment_method == "cash":
+            self.data['payment_info'] = {"method": "cash", "details": "Payment due at check-in"}
+            return self._ask_confirmation()
+        if payment_method == "credit card":
+            self.state = "card_number"
+            return ["Please enter your 16-digit credit card number (no spaces):"]
+        if payment_method == "paypal":
+            self.state = "paypal_email"
+            return ["Please enter your PayPal email address:"]
+        return [self._cancel("Invalid payment method. Please choose from 'credit card', 'paypal', or 'cash'.")]
+
+    def _on_card_number(self, user_input):
+        error = sarabot.validate_card_number(user_input)
+        if error:
+            return [error]
+        self.data['card_number'] = user_input
+        self.state = "expiry"
+        return ["Please enter card expiration date (MM/YY):"]
+
+    def _on_expiry(self, user_input):
+        error = sarabot.validate_expiry(user_input)
+        if error:
+            return [error]
+        self.data['expiry'] = user_input
+        self.state = "cvv"
+        return ["Please enter your 3- or 4-digit CVV:"]
+
+    def _on_cvv(self, user_input):
+        error = sarabot.validate_cvv(user_input)
+        if error:
+            return [error]
+        self.data['payment_info'] = {"method": "credit card", "card_number": self.data['card_number'][-4:], "expiry": self.data['expiry'], "cvv": "XXX"}
+        return self._ask_confirmation()
+
+    def _on_paypal_email(self, user_input):
+        error = sarabot.validate_email(user_input)
+        if error:
+            return [error]
+        self.data['payment_info'] = {"method": "paypal", "email": user_input}
+        return self._ask_confirmation()
+
+    def _ask_confirmation(self):
+        data = self.data
+        room_total = sum(sarabot.ROOM_OPTIONS[room]["price"] * qty * data['nights'] for room, qty in data['rooms'].items())
+        children_ages = data['children_ages']
+        data['booking'] = {
+            'name': data['name'],
+            'phone': data['phone'],
+            'start': data['start'],
+            'end': data['end'],
+            'nights': data['nights'],
+            'guests': f"{data['adults']} adults, {data['children']} children ({', '.join(map(str, children_ages)) if children_ages else 'N/A'})",
+            'rooms': data['rooms'],
+            'checkin': '',
+            'special_requirements': data['special_requirements'],
+            'breakfast': 'Included' if data['include_breakfast'] else 'Not included',
+            'payment_info': data['payment_info'],
+            'room_total': room_total,
+            'breakfast_cost': data['breakfast_cost'],
+            'shuttle_cost': data['shuttle_cost'],
+            'total_price': room_total + data['breakfast_cost'] + data['shuttle_cost'],
+            'booking_ref': 'TBD'
+        }
+        self.state = "confirm"
+        return sarabot.format_booking_summary(data['booking']) + ["Confirm booking? (yes/no)"]
+
+    def _on_confirm(self, user_input):
+        if user_input.lower() not in ['yes', 'y']:
+            return [self._cancel()]
+
+        booking_data = self.data['booking']
+        booking_data['checkin'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with _storage_lock:
+            for room_type, quantity in booking_data['rooms'].items():
+                if not sarabot.check_availability(room_type, quantity, booking_data['start'], booking_data['end']):
+                    return [self._cancel(f"Sorry, {quantity} {room_type}(s) were just booked by another guest for {booking_data['start']} to {booking_data['end']}. Please start a new booking with different rooms or dates.")]
+            success, booking_ref = sarabot.save_booking(
+                booking_data['name'], booking_data['phone'], booking_data['start'], booking_data['end'],
+                booking_data['nights'], booking_data['guests'], booking_data['rooms'], booking_data['checkin'],
+                booking_data['payment_info'], booking_data['special_requirements'])
+        if not success:
+            return [self._cancel("Sorry, we could not save your booking. Please try again or contact support.")]
+
+        booking_data['booking_ref'] = booking_ref
+        self.last_booking = booking_data
+        self.state = "idle"
+        self.data = {}
+        return [
+            f"Thank you, {booking_data['name']}! Your booking is confirmed. Booking Reference: {booking_ref}",
+            "Hotel Information:",
+            f"- Name: {sarabot.HOTEL_INFO['name']}",
+            f"- Address: {sarabot.HOTEL_INFO['address']}",
+            f"- Phone: {sarabot.HOTEL_INFO['phone']}",
+            f"- Email: {sarabot.HOTEL_INFO['email']}",
+        ]
+
+
+class ChatGateway:
+    """Asyncio server that accepts WebSocket chats and runs their turns on a worker pool.
+
+    Limits:
+    - max_connections: chats admitted at once; extra handshakes get HTTP 503.
+    - max_handshakes: accepted sockets still sending their HTTP request, each
+      given handshake_timeout seconds; extra sockets are closed unanswered.
+    - workers: threads running dialogue turns; max_pending turns may wait for one.
+      When every slot is taken, connections stop reading from their sockets.
+    - queue_size: messages buffered per connection before that connection stops
+      being read, which pushes back on the guest through TCP flow control.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, workers=4, max_connections=256,
+                 max_pending=None, queue_size=4, max_message_size=4096, idle_timeout=300,
+                 max_handshakes=64, handshake_timeout=5):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_connections = max_connections
+        self.max_pending = max_pending or workers * 2
+        self.queue_size = queue_size
+        self.max_message_size = max_message_size
+        self.idle_timeout = idle_timeout
+        self.max_handshakes = max_handshakes
+        self.handshake_timeout = handshake_timeout
+        self.executor = None
+        self.server = None
+        self.active_connections = 0
+        self.handshaking = 0
+        self.stats = {"accepted": 0, "rejected": 0, "messages": 0, "errors": 0}
+        self._slots = None
+        self._pending_turns = 0
+        self._handlers = {}
+        self._loop = None
+
+    async def start(self):
+        """Start listening. Port 0 picks a free port, stored back on self.port."""
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sarabot")
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self, grace=5):
+        """Stop accepting connections, give open chats a moment to end, then shut the pool down."""
+        if self.server:
+            self.server.close()
+        # Chats must end before wait_closed(), which waits for every open
+        # connection on Python 3.12.1 and later.
+        if self._handlers:
+            _, unfinished = await asyncio.wait(list(self._handlers), timeout=grace)
+            # Closing the socket makes the chat's next read or write fail, so it ends on its own.
+            for task in unfinished:
+                self._handlers[task].close()
+            if unfinished:
+                _, unfinished = await asyncio.wait(unfinished, timeout=1)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+        if self.server:
+            await self.server.wait_closed()
+        if self.executor:
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"SaraBot gateway listening on ws://{self.host}:{self.port}/ws "
+              f"({self.workers} workers, up to {self.max_connections} chats)")
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def run_blocking(self, func, *args):
+        """Run func on the worker pool, waiting for a free slot first.
+
+        The slot is held until the worker really finishes, even if the caller
+        is cancelled, so max_pending always bounds the work on the pool.
+        """
+        await self._slots.acquire()
+        try:
+            future = self._loop.run_in_executor(self.executor, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending_turns += 1
+        future.add_done_callback(self._release_slot)
+        return await asyncio.shield(future)
+
+    def _release_slot(self, _future):
+        self._pending_turns -= 1
+        self._slots.release()
+
+    def health(self):
+        return {
+            "status": "ok",
+            "active_connections": self.active_connections,
+            "max_connections": self.max_connections,
+            "handshaking": self.handshaking,
+            "workers": self.workers,
+            "pending_turns": self._pending_turns,
+            **self.stats,
+        }
+
+    async def _handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        task.add_done_callback(lambda done: self._handlers.pop(done, None))
+        try:
+            # Sockets count against a limit from the moment they are accepted;
+            # extra ones are closed before anything is read from them.
+            if self.handshaking >= self.max_handshakes:
+                self.stats["rejected"] += 1
+                return
+            self.handshaking += 1
+            try:
+                request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=self.handshake_timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            finally:
+                self.handshaking -= 1
+            method, path, headers = self._parse_request(request)
+
+            if method == "GET" and path == "/health":
+                await self._send_http(writer, 200, "OK", json.dumps(self.health()), "application/json")
+                return
+            if path != "/ws":
+                await self._send_http(writer, 404, "Not Found", "Not found.")
+                return
+            if method != "GET" or headers.get("upgrade", "").lower() != "websocket" or "sec-websocket-key" not in headers:
+                await self._send_http(writer, 400, "Bad Request", "Expected a WebSocket upgrade.")
+                return
+            if not valid_key(headers["sec-websocket-key"]) or headers.get("sec-websocket-version") != "13":
+                await self._send_http(writer, 400, "Bad Request", "Invalid Sec-WebSocket-Key or unsupported Sec-WebSocket-Version.",
+                                      extra_headers={"Sec-WebSocket-Version": "13"})
+                return
+            if self.active_connections >= self.max_connections:
+                self.stats["rejected"] += 1
+                await self._send_http(writer, 503, "Service Unavailable", "Too many guests right now. Please try again shortly.",
+                                      extra_headers={"Retry-After": "1"})
+                return
+
+            self.active_connections += 1
+            try:
+                writer.write((
+                    "HTTP/1.1 101 Switching Protocols\r\n"
+                    "Upgrade: websocket\r\n"
+                    "Connection: Upgrade\r\n"
+                    f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+                ).encode("ascii"))
+                await writer.drain()
+                self.stats["accepted"] += 1
+                await self._run_chat(reader, writer)
+            finally:
+                self.active_connections -= 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def _parse_request(request):
+        lines = request.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        method, path = (parts[0], parts[1].split("?")[0]) if len(parts) >= 2 else ("", "")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        return method, path, headers
+
+    @staticmethod
+    async def _send_http(writer, status, reason, body, content_type="text/plain; charset=utf-8", extra_headers=None):
+        body = body.encode("utf-8")
+        head = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: close"]
+        head.extend(f"{key}: {value}" for key, value in (extra_headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("ascii") + body)
+        await writer.drain()
+
+    async def _run_chat(self, reader, writer):
+        session = BookingSession()
+        inbox = asyncio.Queue(maxsize=self.queue_size)
+        receiver = asyncio.create_task(self._receive(reader, writer, inbox))
+        dispatcher = asyncio.create_task(self._dispatch(session, inbox, writer))
+        # Whichever side finishes first ends the chat: the guest leaving drops
+        # their queued turns, and a finished or broken dispatcher stops reading.
+        try:
+            done, _ = await asyncio.wait({receiver, dispatcher}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            receiver.cancel()
+            dispatcher.cancel()
+            await asyncio.gather(receiver, dispatcher, return_exceptions=True)
+        receiver_error = None if receiver.cancelled() else receiver.exception()
+        dispatcher_error = None if dispatcher.cancelled() else dispatcher.exception()
+        if receiver in done and receiver_error is None and not writer.is_closing():
+            writer.write(encode_frame(OP_CLOSE, close_payload(receiver.result())))
+            await writer.drain()
+        if receiver_error is not None:
+            raise receiver_error
+        if dispatcher_error is not None:
+            raise dispatcher_error
+
+    async def _receive(self, reader, writer, inbox):
+        """Queue incoming messages for the dispatcher and return the close code to send."""
+        while True:
+            try:
+                opcode, payload = await asyncio.wait_for(
+                    read_message(reader, writer, self.max_message_size), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                return 1001
+            except ProtocolError as e:
+                return e.code
+            if opcode == OP_CLOSE:
+                return 1000
+            if opcode == OP_BINARY:
+                return 1003
+            try:
+                text = payload.decode("utf-8")
+            except UnicodeDecodeError:
+                return 1007
+            # Blocks while the inbox is full, so this socket is not read any further.
+            await inbox.put(text)
+
+    async def _dispatch(self, session, inbox, writer):
+        while True:
+            text = await inbox.get()
+            try:
+                reply = await self.run_blocking(session.respond, text)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"SaraBot: Error while handling a message: {e}")
+                session.state = "idle"
+                session.data = {}
+                reply = "Sorry, something went wrong on our side. Let's start over — how can I help you?"
+            self.stats["messages"] += 1
+            writer.write(encode_frame(OP_TEXT, reply.encode("utf-8")))
+            await writer.drain()
+            if session.closed:
+                writer.write(encode_frame(OP_CLOSE, close_payload(1000)))
+                await writer.drain()
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve SaraBot over WebSocket.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=4, help="Threads running dialogue turns.")
+    parser.add_argument("--max-connections", type=int, default=256, help="Chats admitted at once.")
+    parser.add_argument("--max-handshakes", type=int, default=64, help="Connections allowed to be mid-handshake at once.")
+    parser.add_argument("--max-pending", type=int, default=None, help="Turns queued for the pool (default: 2 x workers).")
+    parser.add_argument("--queue-size", type=int, default=4, help="Buffered messages per chat.")
+    parser.add_argument("--bookings-csv", default=sarabot.BOOKINGS_CSV, help="Where bookings are stored.")
+    args = parser.parse_args()
+
+    sarabot.BOOKINGS_CSV = args.bookings_csv
+    gateway = ChatGateway(args.host, args.port, workers=args.workers, max_connections=args.max_connections,
+                          max_handshakes=args.max_handshakes, max_pending=args.max_pending, queue_size=args.queue_size)
+    try:
+        asyncio.run(gateway.serve_forever())
+    except KeyboardInterrupt:
+        print("SaraBot gateway stopped.")
+
+
+if __name__ == "__main__":
+    main()
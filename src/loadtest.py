@@ -0,0 +1,196 @@
+"""Load-test harness for the SaraBot gateway.
+
+Without --port, starts a gateway in this process on a free port. That gateway
+writes bookings to a temporary CSV, so data/bookings.csv is never touched. Each
+simulated guest then runs a full booking conversation over WebSocket. The
+harness reports per-message latency, throughput and how many guests the
+gateway turned away.
+
+    python src/loadtest.py --guests 200 --concurrency 50
+    python src/loadtest.py --port 8765 --guests 100   # against a running gateway
+"""
+import argparse
+import asyncio
+import base64
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import gateway
+import main as sarabot
+
+
+class Rejected(Exception):
+    """Raised when the gateway refuses a connection with HTTP 503."""
+
+
+class ChatClient:
+    """Minimal WebSocket client that sends one message and waits for one reply."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host, port, path="/ws"):
+        reader, writer = await asyncio.open_connection(host, port)
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        writer.write((
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        ).encode("ascii"))
+        await writer.drain()
+        response = await reader.readuntil(b"\r\n\r\n")
+        status = response.split(b" ", 2)[1]
+        if status == b"503":
+            writer.close()
+            raise Rejected()
+        if status != b"101" or gateway.accept_key(key).encode("ascii") not in response:
+            writer.close()
+            raise ConnectionError(f"Handshake failed: {response.splitlines()[0].decode('latin-1')}")
+        return cls(reader, writer)
+
+    async def ask(self, text):
+        """Send one message and return the bot's reply, or None if the bot closed the chat."""
+        self.writer.write(gateway.encode_frame(gateway.OP_TEXT, text.encode("utf-8"), mask=True))
+        await self.writer.drain()
+        opcode, payload = await gateway.read_message(self.reader, self.writer, 1 << 20, client=True)
+        if opcode == gateway.OP_CLOSE:
+            return None
+        return payload.decode("utf-8")
+
+    async def close(self):
+        try:
+            self.writer.write(gateway.encode_frame(gateway.OP_CLOSE, gateway.close_payload(1000), mask=True))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def conversation(guest_number, confirm):
+    """Scripted booking for one guest as (message, text expected in the reply) pairs.
+
+    Check-in dates are spread over the next year so confirmed bookings do not
+    run out of rooms.
+    """
+    check_in = (datetime.today() + timedelta(days=1 + guest_number % 365)).strftime("%Y-%m-%d")
+    return [
+        ("hello", "Welcome"),
+        ("I want to book a room", "full name"),
+        (f"Load Guest {guest_number}", "phone number"),
+        ("+49 123 456 789", "What dates"),
+        (check_in, "How many nights"),
+        ("2", "adults"),
+        ("2 adults", "select one or more room types"),
+        ("1 King Room", "breakfast"),
+        ("yes", "shuttle"),
+        ("no", "disability"),
+        ("no", "special requests"),
+        ("no", "Payment method"),
+        ("cash", "Confirm booking"),
+        ("yes" if confirm else "no", "Booking Reference" if confirm else "canceled"),
+        ("bye", "Thank you for visiting"),
+    ]
+
+
+async def run_guest(host, port, guest_number, confirm, results):
+    try:
+        client = await ChatClient.connect(host, port)
+    except Rejected:
+        results["rejected"] += 1
+        return
+    except (ConnectionError, OSError, asyncio.IncompleteReadError):
+        results["failed"] += 1
+        return
+
+    try:
+        for message, expected in conversation(guest_number, confirm):
+            started = time.perf_counter()
+            reply = await client.ask(message)
+            results["latencies"].append(time.perf_counter() - started)
+            if reply is None or expected not in reply:
+                results["failed"] += 1
+                return
+        results["completed"] += 1
+    except (ConnectionError, asyncio.IncompleteReadError, gateway.ProtocolError):
+        results["failed"] += 1
+    finally:
+        await client.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(host, port, guests, concurrency, confirm):
+    results = {"completed": 0, "rejected": 0, "failed": 0, "latencies": []}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def guarded(guest_number):
+        async with limit:
+            await run_guest(host, port, guest_number, confirm, results)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(guarded(number) for number in range(guests)))
+    results["elapsed"] = time.perf_counter() - started
+    return results
+
+
+def print_report(results):
+    latencies = sorted(results["latencies"])
+    elapsed = results["elapsed"]
+    print(f"Guests completed: {results['completed']}, rejected: {results['rejected']}, failed: {results['failed']}")
+    print(f"Messages: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed if elapsed else 0:.1f} msg/s)")
+    print("Latency (ms): " + ", ".join(
+        f"{name} {percentile(latencies, fraction) * 1000:.1f}"
+        for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))))
+
+
+async def main_async(args):
+    if args.port:
+        results = await run_load(args.host, args.port, args.guests, args.concurrency, args.confirm)
+        print_report(results)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sarabot.BOOKINGS_CSV = os.path.join(tmp_dir, "bookings.csv")
+        server = gateway.ChatGateway("127.0.0.1", 0, workers=args.workers,
+                                     max_connections=args.max_connections)
+        await server.start()
+        try:
+            results = await run_load("127.0.0.1", server.port, args.guests, args.concurrency, args.confirm)
+        finally:
+            health = server.health()
+            await server.stop()
+        print_report(results)
+        print(f"Gateway: {health['accepted']} chats accepted, {health['rejected']} rejected, "
+              f"{health['messages']} messages, {health['errors']} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the SaraBot gateway.")
+    parser.add_argument("--host", default="127.0.0.1", help="Gateway host when --port is given.")
+    parser.add_argument("--port", type=int, default=None, help="Port of a running gateway. Omit to start a local one.")
+    parser.add_argument("--guests", type=int, default=100, help="Conversations to run in total.")
+    parser.add_argument("--concurrency", type=int, default=20, help="Conversations open at the same time.")
+    parser.add_argument("--confirm", action="store_true", help="Confirm each booking, which writes to storage.")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads for the local gateway.")
+    parser.add_argument("--max-connections", type=int, default=256, help="Admission limit for the local gateway.")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -234,6 +234,48 @@ def check_availability(room_type, quantity, start_date, end_date):
     except Exception:
         return False
 
+def validate_phone(phone):
+    """Return an error message if the phone number is not valid, otherwise None."""
+    if not re.match(r'^\+?[\d\s\-\(\)]{7,20}$', phone):
+        return "Invalid phone number format. Please enter a valid phone number (e.g., +49 123 456 789)."
+    return None
+
+def validate_card_number(card_number):
+    """Return an error message if the card number is not 16 digits, otherwise None."""
+    if not (card_number.isdigit() and len(card_number) == 16):
+        return "Invalid card number. Please enter a 16-digit number."
+    return None
+
+def validate_expiry(expiry):
+    """Return an error message if the MM/YY expiry date is malformed or in the past, otherwise None."""
+    if not re.match(r'^(0[1-9]|1[0-2])/\d{2}$', expiry):
+        return "Invalid expiration date. Please use MM/YY format (e.g., 12/25)."
+    month, year = map(int, expiry.split('/'))
+    current_year_full = datetime.now().year
+    current_month = datetime.now().month
+
+    if year < 100:
+        year_full = 2000 + year if year >= (current_year_full % 100) else 2100 + year
+    else:
+        year_full = year
+
+    if (year_full < current_year_full) or \
+       (year_full == current_year_full and month < current_month):
+        return "Expiration date is in the past. Please try again."
+    return None
+
+def validate_cvv(cvv):
+    """Return an error message if the CVV is not 3 or 4 digits, otherwise None."""
+    if not (cvv.isdigit() and 3 <= len(cvv) <= 4):
+        return "Invalid CVV. Please enter a 3- or 4-digit number."
+    return None
+
+def validate_email(email):
+    """Return an error message if the PayPal email address is not valid, otherwise None."""
+    if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
+        return "Invalid email address. Please enter a valid PayPal email."
+    return None
+
 def collect_payment_info(payment_method):
     """Collect and validate payment information based on the payment method."""
     if payment_method == "cash":
@@ -244,8 +286,9 @@ def collect_payment_info(payment_method):
             card_number = input("SaraBot: Please enter your 16-digit credit card number (no spaces):\nYou: ").strip()
             if card_number.lower() in ['cancel', 'exit']:
                 return None, "cancel"
-            if not (card_number.isdigit() and len(card_number) == 16):
-                print("SaraBot: Invalid card number. Please enter a 16-digit number.")
+            error = validate_card_number(card_number)
+            if error:
+                print(f"SaraBot: {error}")
                 continue
             break
 
@@ -253,21 +296,9 @@ def collect_payment_info(payment_method):
             expiry = input("SaraBot: Please enter card expiration date (MM/YY):\nYou: ").strip()
             if expiry.lower() in ['cancel', 'exit']:
                 return None, "cancel"
-            if not re.match(r'^(0[1-9]|1[0-2])/\d{2}$', expiry):
-                print("SaraBot: Invalid expiration date. Please use MM/YY format (e.g., 12/25).")
-                continue
-            month, year = map(int, expiry.split('/'))
-            current_year_full = datetime.now().year
-            current_month = datetime.now().month
-            
-            if year < 100:
-                year_full = 2000 + year if year >= (current_year_full % 100) else 2100 + year
-            else:
-                year_full = year
-
-            if (year_full < current_year_full) or \
-               (year_full == current_year_full and month < current_month):
-                print("SaraBot: Expiration date is in the past. Please try again.")
+            error = validate_expiry(expiry)
+            if error:
+                print(f"SaraBot: {error}")
                 continue
             break
 
@@ -275,8 +306,9 @@ def collect_payment_info(payment_method):
             cvv = input("SaraBot: Please enter your 3- or 4-digit CVV:\nYou: ").strip()
             if cvv.lower() in ['cancel', 'exit']:
                 return None, "cancel"
-            if not (cvv.isdigit() and 3 <= len(cvv) <= 4):
-                print("SaraBot: Invalid CVV. Please enter a 3- or 4-digit number.")
+            error = validate_cvv(cvv)
+            if error:
+                print(f"SaraBot: {error}")
                 continue
             break
 
@@ -287,8 +319,9 @@ def collect_payment_info(payment_method):
             email = input("SaraBot: Please enter your PayPal email address:\nYou: ").strip()
             if email.lower() in ['cancel', 'exit']:
                 return None, "cancel"
-            if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                print("SaraBot: Invalid email address. Please enter a valid PayPal email.")
+            error = validate_email(email)
+            if error:
+                print(f"SaraBot: {error}")
                 continue
             break
 
@@ -403,8 +436,8 @@ def save_booking(name, phone, start, end, nights, guests, rooms, checkin, paymen
         print(f"SaraBot: Failed to save booking due to unexpected error: {str(e)}. Please try again or contact support.")
         return False, None
 
-def generate_booking_summary(booking_data, is_final=False):
-    """Generates and prints a formatted booking summary with a slow appearance effect."""
+def format_booking_summary(booking_data, is_final=False):
+    """Build the lines of a formatted booking summary."""
     rooms = booking_data['rooms']
     room_details = "\n".join([f"  - {qty} {room} @ {ROOM_OPTIONS[room]['price']}€/night x {booking_data['nights']} nights = {qty * ROOM_OPTIONS[room]['price'] * booking_data['nights']}€" for room, qty in rooms.items()])
     
@@ -453,8 +486,12 @@ def generate_booking_summary(booking_data, is_final=False):
         summary_lines.append("\n--- Confirmation ---")
         summary_lines.append(f"- Booking Confirmed: {booking_data['checkin']}")
         summary_lines.append(f"- Payment: {payment_details}")
-    
-    for line in summary_lines:
+
+    return summary_lines
+
+def generate_booking_summary(booking_data, is_final=False):
+    """Generates and prints a formatted booking summary with a slow appearance effect."""
+    for line in format_booking_summary(booking_data, is_final):
         slow_print(line)
         time.sleep(0.05)
 
@@ -477,8 +514,9 @@ def handle_booking():
         if phone.lower() in ['cancel', 'exit']:
             print("SaraBot: Booking canceled. Let me know how I can assist you further!")
             return None
-        if not re.match(r'^\+?[\d\s\-\(\)]{7,20}$', phone):
-            print("SaraBot: Invalid phone number format. Please enter a valid phone number (e.g., +49 123 456 789).")
+        error = validate_phone(phone)
+        if error:
+            print(f"SaraBot: {error}")
             continue
         break
 
@@ -0,0 +1,256 @@
+import asyncio
+import base64
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import gateway  # noqa: E402
+import loadtest  # noqa: E402
+import main as sarabot  # noqa: E402
+
+
+class FakeWriter:
+    def __init__(self):
+        self.written = bytearray()
+
+    def write(self, data):
+        self.written += data
+
+
+def stream(*frames):
+    reader = asyncio.StreamReader()
+    for frame in frames:
+        reader.feed_data(frame)
+    reader.feed_eof()
+    return reader
+
+
+def fragment(opcode, payload):
+    """Encode a masked frame with the FIN bit cleared."""
+    frame = gateway.encode_frame(opcode, payload, mask=True)
+    return bytes([frame[0] & 0x7F]) + frame[1:]
+
+
+class FrameTests(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip_at_length_boundaries(self):
+        for length, header_size in ((0, 6), (125, 6), (126, 8), (65535, 8), (65536, 14)):
+            payload = os.urandom(length)
+            frame = gateway.encode_frame(gateway.OP_BINARY, payload, mask=True)
+            self.assertEqual(len(frame), header_size + length)
+            fin, opcode, decoded = await gateway.read_frame(stream(frame), 1 << 20)
+            self.assertEqual((fin, opcode, decoded), (True, gateway.OP_BINARY, payload))
+
+    async def test_server_frames_are_not_masked(self):
+        frame = gateway.encode_frame(gateway.OP_TEXT, b"hello")
+        self.assertEqual(frame, b"\x81\x05hello")
+        self.assertEqual(await gateway.read_frame(stream(frame), 125, expect_mask=False),
+                         (True, gateway.OP_TEXT, b"hello"))
+
+    async def test_unmasked_client_frame_is_rejected(self):
+        with self.assertRaises(gateway.ProtocolError) as caught:
+            await gateway.read_frame(stream(gateway.encode_frame(gateway.OP_TEXT, b"hi")), 125)
+        self.assertEqual(caught.exception.code, 1002)
+
+    async def test_masked_server_frame_is_rejected(self):
+        frame = gateway.encode_frame(gateway.OP_TEXT, b"hi", mask=True)
+        with self.assertRaises(gateway.ProtocolError) as caught:
+            await gateway.read_frame(stream(frame), 125, expect_mask=False)
+        self.assertEqual(caught.exception.code, 1002)
+
+    async def test_fragmented_message_with_ping_in_between(self):
+        writer = FakeWriter()
+        reader = stream(
+            fragment(gateway.OP_TEXT, b"Hello, "),
+            gateway.encode_frame(gateway.OP_PING, b"are you there", mask=True),
+            gateway.encode_frame(gateway.OP_CONTINUATION, b"Sara", mask=True),
+        )
+        self.assertEqual(await gateway.read_message(reader, writer, 1024), (gateway.OP_TEXT, b"Hello, Sara"))
+        self.assertEqual(bytes(writer.written), gateway.encode_frame(gateway.OP_PONG, b"are you there"))
+
+    async def test_continuation_without_start_is_rejected(self):
+        reader = stream(gateway.encode_frame(gateway.OP_CONTINUATION, b"x", mask=True))
+        with self.assertRaises(gateway.ProtocolError) as caught:
+            await gateway.read_message(reader, FakeWriter(), 1024)
+        self.assertEqual(caught.exception.code, 1002)
+
+    async def test_message_size_limit(self):
+        reader = stream(gateway.encode_frame(gateway.OP_TEXT, b"x" * 200, mask=True))
+        with self.assertRaises(gateway.ProtocolError) as caught:
+            await gateway.read_message(reader, FakeWriter(), 150)
+        self.assertEqual(caught.exception.code, 1009)
+
+    async def test_message_size_limit_across_fragments(self):
+        reader = stream(
+            fragment(gateway.OP_TEXT, b"x" * 100),
+            gateway.encode_frame(gateway.OP_CONTINUATION, b"x" * 100, mask=True),
+        )
+        with self.assertRaises(gateway.ProtocolError) as caught:
+            await gateway.read_message(reader, FakeWriter(), 150)
+        self.assertEqual(caught.exception.code, 1009)
+
+
+def book_until_confirmation(session, check_in, room="1 Single Room"):
+    for message in ["book a room", "Ann Guest", "+49 123 456 789", check_in, "1", "1 adult", room,
+                    "no", "no", "no", "no"]:
+        session.respond(message)
+    reply = session.respond("cash")
+    assert session.state == "confirm", reply
+    return reply
+
+
+class BookingSessionTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = mock.patch.object(sarabot, "BOOKINGS_CSV", os.path.join(tmp_dir.name, "bookings.csv"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.check_in = (datetime.today() + timedelta(days=10)).strftime("%Y-%m-%d")
+
+    def test_cancel_mid_booking(self):
+        session = gateway.BookingSession()
+        session.respond("book")
+        session.respond("Ann Guest")
+        self.assertEqual(session.respond("cancel"), gateway.CANCEL_MESSAGE)
+        self.assertEqual(session.state, "idle")
+        self.assertEqual(session.data, {})
+
+    def test_invalid_answers_reprompt(self):
+        session = gateway.BookingSession()
+        session.respond("book")
+        session.respond("Ann Guest")
+        self.assertIn("Invalid phone number", session.respond("12"))
+        self.assertEqual(session.state, "phone")
+        session.respond("+49 123 456 789")
+        self.assertIn("couldn't understand", session.respond("not a date at all"))
+        self.assertEqual(session.state, "dates")
+
+    def test_nights_out_of_range_reprompt(self):
+        session = gateway.BookingSession()
+        for message in ["book", "Ann Guest", "+49 123 456 789", self.check_in]:
+            session.respond(message)
+        for nights in ["99999999999", "0", "-3", str(gateway.MAX_NIGHTS + 1)]:
+            self.assertIn("between 1 and", session.respond(nights))
+            self.assertEqual(session.state, "nights")
+        self.assertIn("for 2 nights", session.respond("2"))
+        self.assertEqual(session.state, "guests")
+
+    def test_date_overflow_reprompts(self):
+        session = gateway.BookingSession()
+        for message in ["book", "Ann Guest", "+49 123 456 789"]:
+            session.respond(message)
+        self.assertIn("couldn't understand", session.respond("tomorrow for 99999999 nights"))
+        self.assertEqual(session.state, "dates")
+        self.assertIn("up to", session.respond(f"tomorrow for {gateway.MAX_NIGHTS + 1} nights"))
+        self.assertEqual(session.state, "dates")
+        self.assertEqual(session.data["name"], "Ann Guest")
+
+    def test_confirmed_booking_is_saved(self):
+        session = gateway.BookingSession()
+        self.assertIn("Confirm booking?", book_until_confirmation(session, self.check_in))
+        self.assertIn("Booking Reference", session.respond("yes"))
+        self.assertEqual(session.state, "idle")
+        self.assertEqual(session.last_booking["rooms"], {"Single Room": 1})
+
+    def test_last_room_taken_before_confirmation(self):
+        first, second = gateway.BookingSession(), gateway.BookingSession()
+        with mock.patch.dict(sarabot.ROOM_INVENTORY, {"Single Room": 1}):
+            book_until_confirmation(first, self.check_in)
+            book_until_confirmation(second, self.check_in)
+            self.assertIn("Booking Reference", first.respond("yes"))
+            self.assertIn("just booked by another guest", second.respond("yes"))
+        self.assertEqual(second.state, "idle")
+        self.assertIsNone(second.last_booking)
+
+    def test_new_booking_clears_last_booking(self):
+        session = gateway.BookingSession()
+        book_until_confirmation(session, self.check_in)
+        session.respond("yes")
+        session.respond("book again")
+        session.respond("cancel")
+        self.assertIsNone(session.last_booking)
+        self.assertEqual(session.respond(""), "Please type something to continue.")
+
+    def test_goodbye_closes_session(self):
+        session = gateway.BookingSession()
+        self.assertEqual(session.respond("bye"), sarabot.RESPONSES["goodbye"])
+        self.assertTrue(session.closed)
+
+
+async def raw_handshake(port, key, version="13"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write((
+        "GET /ws HTTP/1.1\r\n"
+        "Host: localhost\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        f"Sec-WebSocket-Version: {version}\r\n\r\n"
+    ).encode("utf-8"))
+    response = await reader.readuntil(b"\r\n\r\n")
+    writer.close()
+    return response.split(b"\r\n", 1)[0]
+
+
+class GatewayTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = gateway.ChatGateway("127.0.0.1", 0, workers=2, max_connections=1)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.stop(grace=0.1)
+
+    async def test_admission_limit_and_stop_with_open_chat(self):
+        client = await loadtest.ChatClient.connect("127.0.0.1", self.server.port)
+        self.assertEqual(await client.ask("hi"), sarabot.RESPONSES["greeting"])
+        with self.assertRaises(loadtest.Rejected):
+            await loadtest.ChatClient.connect("127.0.0.1", self.server.port)
+        self.assertEqual(self.server.health()["rejected"], 1)
+
+        await asyncio.wait_for(self.server.stop(grace=0.2), timeout=5)
+        self.assertEqual(self.server.active_connections, 0)
+        await client.close()
+
+    async def test_bad_handshake_gets_400(self):
+        good_key = base64.b64encode(os.urandom(16)).decode("ascii")
+        for key, version in (("é", "13"), ("not base64!", "13"),
+                             (base64.b64encode(os.urandom(8)).decode("ascii"), "13"), (good_key, "8")):
+            self.assertEqual(await raw_handshake(self.server.port, key, version), b"HTTP/1.1 400 Bad Request")
+        self.assertEqual(self.server.health()["accepted"], 0)
+        self.assertEqual(self.server.active_connections, 0)
+
+    async def test_sockets_beyond_handshake_limit_are_closed(self):
+        server = gateway.ChatGateway("127.0.0.1", 0, max_handshakes=1, handshake_timeout=0.5)
+        await server.start()
+        try:
+            _, idle_writer = await asyncio.open_connection("127.0.0.1", server.port)
+            while server.handshaking < 1:
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            self.assertEqual(await asyncio.wait_for(reader.read(), timeout=1), b"")
+            self.assertEqual(server.health()["rejected"], 1)
+            writer.close()
+            # The idle socket is dropped once its handshake times out.
+            while server.handshaking:
+                await asyncio.sleep(0.05)
+            idle_writer.close()
+        finally:
+            await server.stop(grace=0.1)
+
+    async def test_unmasked_frame_closes_chat(self):
+        client = await loadtest.ChatClient.connect("127.0.0.1", self.server.port)
+        client.writer.write(gateway.encode_frame(gateway.OP_TEXT, b"hi"))
+        opcode, payload = await gateway.read_message(client.reader, client.writer, 1024, client=True)
+        self.assertEqual(opcode, gateway.OP_CLOSE)
+        self.assertEqual(struct.unpack("!H", payload[:2])[0], 1002)
+        await client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()